@@ -4,14 +4,16 @@ import seaborn as sns
 import json
 
 # Load data
-char_subs = pd.read_csv('moj_rezultat_char_subs.csv')
-errors = pd.read_csv('moj_rezultat_errors.csv')
+char_subs = pd.read_csv('moj_rezultat_char_subs.csv', usecols=['ref_char', 'hyp_char', 'count'],
+                        dtype={'count': 'int32'})
+errors = pd.read_csv('moj_rezultat_errors.csv', usecols=['error_type'])
 with open('moj_rezultat_stats.json', 'r') as f:
     stats = json.load(f)
 
-# Errors from errors.csv
-insertions = len(errors[errors['error_type'] == 'I'])
-substitutions = len(errors[errors['error_type'] == 'S'])
+# Errors from errors.csv, counted in a single pass
+counts = errors['error_type'].value_counts()
+insertions = int(counts.get('I', 0))
+substitutions = int(counts.get('S', 0))
 total_chars = stats['total_chars_hyp']
 
 # Plots
@@ -1,73 +1,105 @@
 import csv
 import re
-from docx import Document
+import sys
+import zipfile
+from lxml import etree
 import pywer
 
+NS = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+W_BODY = '{%s}body' % NS['w']
+W_P = '{%s}p' % NS['w']
+W_T = '{%s}t' % NS['w']
+W_BR = '{%s}br' % NS['w']
+W_TYPE = '{%s}type' % NS['w']
+# Text equivalents of the other run content elements, as in python-docx
+_RUN_TEXT = {
+    '{%s}tab' % NS['w']: '\t',
+    '{%s}ptab' % NS['w']: '\t',
+    '{%s}cr' % NS['w']: '\n',
+    '{%s}noBreakHyphen' % NS['w']: '-',
+}
+# Compiled once instead of re-parsing the expression for every paragraph
+_PAGE_BREAK_XPATH = etree.XPath('.//w:br[@w:type="page"]', namespaces=NS)
+# Content of the paragraph's own runs only (not text boxes or alternate content)
+_RUN_CONTENT_XPATH = etree.XPath('w:r/* | w:hyperlink/w:r/*', namespaces=NS)
+
+
+# Every Unicode decimal digit, same as \d
+_DIGITS = ''.join(chr(c) for c in range(sys.maxunicode + 1) if chr(c).isdecimal())
+# All digits plus brackets and their angle variants, deleted with str.translate in one pass
+_DROP = dict.fromkeys(map(ord, _DIGITS + '[](){}<>'), None)
+_WS = re.compile(r'\s+')
+
+
+def strip_line_number(line: str) -> str:
+    # Remove a leading line number and dot ("12. ") together with the surrounding whitespace
+    rest = line.lstrip()
+    after_number = rest.lstrip(_DIGITS)
+    if len(after_number) < len(rest) and after_number.startswith('.'):
+        return after_number[1:].lstrip()
+    return line
+
 
 def normalize(text: str) -> str:
     # Remove leading line numbers and dots at each line start
-    text = re.sub(r'^\s*\d+\.\s*', '', text, flags=re.MULTILINE)
-    # Remove all digits (numbers)
-    text = re.sub(r'\d+', '', text)
-    # Remove all brackets and their angle variants
-    text = re.sub(r'[\[\]\(\)\{\}\<\>]', '', text)
-    # Convert to lowercase
-    text = text.lower()
-    # Collapse multiple whitespace characters into a single space
-    text = re.sub(r'\s+', ' ', text)
-    # Strip leading and trailing whitespace
-    return text.strip()
-
-
-# Load documents
-hand_doc = Document("mestrija_handtranscription.docx")
-trans_doc = Document("mestrija_transkribus.docx")
-
-
-# Function to split document text by page breaks
-def split_by_page(doc):
-    pages = []
-    current_page_text = []
-    for para in doc.paragraphs:
-        if para.text.strip() == '' and current_page_text:
-            pages.append('\n'.join(current_page_text))
-            current_page_text = []
+    text = '\n'.join(map(strip_line_number, text.split('\n')))
+    # Remove all digits and brackets
+    text = text.translate(_DROP)
+    # Lowercase, collapse whitespace into a single space and strip the ends
+    return _WS.sub(' ', text.lower()).strip()
+
+
+# Paragraph text the same way python-docx builds Paragraph.text
+def paragraph_text(para):
+    parts = []
+    for el in _RUN_CONTENT_XPATH(para):
+        if el.tag == W_T:
+            parts.append(el.text or '')
+        elif el.tag == W_BR:
+            # Only line breaks become newlines, page and column breaks add no text
+            if el.get(W_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
         else:
-            current_page_text.append(para.text)
-    if current_page_text:
-        pages.append('\n'.join(current_page_text))
-    return pages
-
+            parts.append(_RUN_TEXT.get(el.tag, ''))
+    return ''.join(parts)
 
-from docx import Document
 
-hand_pages = split_by_page(hand_doc)
-trans_pages = split_by_page(trans_doc)
-
-def split_by_page(doc):
-    pages = []
+# Function to split a .docx into pages by page breaks, streaming word/document.xml
+# paragraph by paragraph instead of building the full python-docx document
+def stream_pages(path):
     current_page = []
-    for para in doc.paragraphs:
-        current_page.append(para.text)
-        # Check for page break
-        if para._element.xpath('.//w:br[@w:type="page"]'):
-            pages.append('\n'.join(current_page))
-            current_page = []
+    with zipfile.ZipFile(path) as z, z.open('word/document.xml') as xml:
+        for _, para in etree.iterparse(xml, tag=W_P):
+            # Only body-level paragraphs, like Document.paragraphs
+            if para.getparent().tag != W_BODY:
+                continue
+            current_page.append(paragraph_text(para))
+            # Check for page break
+            if _PAGE_BREAK_XPATH(para):
+                yield '\n'.join(current_page)
+                current_page = []
+            # Drop parsed paragraphs (and tables between them) to keep memory flat
+            para.clear()
+            while para.getprevious() is not None:
+                del para.getparent()[0]
     if current_page:
-        pages.append('\n'.join(current_page))
-    return pages
+        yield '\n'.join(current_page)
+
+
+# Load documents
+hand_pages = list(stream_pages("mestrija_handtranscription.docx"))
+trans_pages = list(stream_pages("mestrija_transkribus.docx"))
 
 num_pages = min(len(hand_pages), len(trans_pages))
 
 
-# Calculate CER and WER for each page
-results = []
-for i in range(num_pages):
-    ref = normalize(hand_pages[i])
-    hyp = normalize(trans_pages[i])
-    cer = pywer.cer([ref], [hyp])
-    wer = pywer.wer([ref], [hyp])
-    results.append([i+1, cer, wer])
+# Normalize all pages up front, then calculate CER and WER for each page
+refs = [normalize(page) for page in hand_pages[:num_pages]]
+hyps = [normalize(page) for page in trans_pages[:num_pages]]
+pairs = list(zip(refs, hyps))
+cers = [pywer.cer([ref], [hyp]) for ref, hyp in pairs]
+wers = [pywer.wer([ref], [hyp]) for ref, hyp in pairs]
+results = list(zip(range(1, num_pages + 1), cers, wers))
 
 
 # Write results in CSV file
@@ -78,7 +110,11 @@ with open('page_level_cer_wer.csv', 'w', newline='', encoding='utf-8') as csvfil
 
 print("Page-level CER and WER written to page_level_cer_wer.csv")
 
+# Corpus-level CER and WER in a single call over all pages
+print(f"Corpus-level CER: {pywer.cer(refs, hyps):.2f}, WER: {pywer.wer(refs, hyps):.2f}")
+
 # Export .txt files
+ref, hyp = pairs[-1]
 with open("reference_normalized.txt", "w", encoding="utf-8") as f:
     f.write(ref)
 with open("hypothesis_normalized.txt", "w", encoding="utf-8") as f:
@@ -18,14 +18,33 @@ Outputs:
 import argparse
 import csv
 import json
+import os
 import re
+from array import array
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-from itertools import groupby
-from typing import List, Dict, Tuple, Optional, NamedTuple
+from pathlib import Path
+from itertools import groupby, islice
+from typing import List, Dict, Tuple, Optional, NamedTuple, Iterator
 from difflib import SequenceMatcher
 
+try:
+    from rapidfuzz.distance import Levenshtein
+except ImportError:  # fall back to the pure-Python DP below
+    Levenshtein = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy/numba are optional, they only speed up the fallback DP
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 @dataclass
 class EditOp:
@@ -53,40 +72,38 @@ class ErrorType(Enum):
     ABBR_EXP = "abbrev_expansion"
 
 
+_EDITOP_TAGS = {'replace': 'S', 'delete': 'D', 'insert': 'I'}
+
+
 def levenshtein_align(ref: str, hyp: str) -> List[EditOp]:
-    """Compute character-level Levenshtein alignment."""
+    """Compute character-level Levenshtein alignment.
+
+    When several alignments are equally good, rapidfuzz and the fallback DP may pick
+    different ones: the total distance is the same, but the split into S/D/I (and the
+    substitution pairs) can differ between the two backends.
+    """
+    if Levenshtein is not None:
+        return _editops_align(ref, hyp)
+
     n, m = len(ref), len(hyp)
-    dp = [[0] * (m + 1) for _ in range(n + 1)]
-    
-    for i in range(n + 1):
-        dp[i][0] = i
-    for j in range(m + 1):
-        dp[0][j] = j
-    
-    for i in range(1, n + 1):
-        for j in range(1, m + 1):
-            cost = 0 if ref[i-1] == hyp[j-1] else 1
-            dp[i][j] = min(
-                dp[i-1][j] + 1,      # deletion
-                dp[i][j-1] + 1,      # insertion
-                dp[i-1][j-1] + cost  # substitution
-            )
-    
+    dp = _levenshtein_table(ref, hyp)
+    stride = m + 1
 
     ops = []
     i = n
     j = m
     
     while i > 0 or j > 0:
+        cell = i * stride + j
         if i > 0 and j > 0 and ref[i-1] == hyp[j-1]:
             ops.append(EditOp(ref[i-1], hyp[j-1], '='))
             i -= 1
             j -= 1
-        elif i > 0 and j > 0 and dp[i][j] == dp[i-1][j-1] + 1:
+        elif i > 0 and j > 0 and dp[cell] == dp[cell - stride - 1] + 1:
             ops.append(EditOp(ref[i-1], hyp[j-1], 'S'))
             i -= 1
             j -= 1
-        elif i > 0 and dp[i][j] == dp[i-1][j] + 1:
+        elif i > 0 and dp[cell] == dp[cell - stride] + 1:
             ops.append(EditOp(ref[i-1], '', 'D'))
             i -= 1
         else:
@@ -96,17 +113,124 @@ def levenshtein_align(ref: str, hyp: str) -> List[EditOp]:
     return ops[::-1]
 
 
-def word_align(ref_words: List[str], hyp_words: List[str]) -> List[WordEditOp]:
-    """Simplified word-level alignment using difflib."""
-    ref_str = ' '.join(ref_words)
-    hyp_str = ' '.join(hyp_words)
+def _levenshtein_table(ref: str, hyp: str):
+    """Fill the Levenshtein DP table for ref/hyp.
+
+    The table is returned flat in row-major order: cell (i, j) is at i * (m + 1) + j.
+    """
+    n, m = len(ref), len(hyp)
+
+    if njit is not None:
+        dp = np.zeros((n + 1, m + 1), np.int32)
+        _lev_fill(_codepoints(ref), _codepoints(hyp), dp)
+        return dp.ravel()
+
+    if np is not None:
+        return _diagonal_fill(_codepoints(ref), _codepoints(hyp)).ravel()
+
+    # One contiguous array of C ints instead of a list of lists of Python ints
+    stride = m + 1
+    dp = array('i', [0]) * ((n + 1) * stride)
+    
+    for i in range(n + 1):
+        dp[i * stride] = i
+    for j in range(m + 1):
+        dp[j] = j
+    
+    for i in range(1, n + 1):
+        row = i * stride
+        prev = row - stride
+        for j in range(1, m + 1):
+            cost = 0 if ref[i-1] == hyp[j-1] else 1
+            dp[row + j] = min(
+                dp[prev + j] + 1,        # deletion
+                dp[row + j - 1] + 1,     # insertion
+                dp[prev + j - 1] + cost  # substitution
+            )
     
-    matcher = SequenceMatcher(None, ref_str, hyp_str)
+    return dp
+
+
+def _codepoints(s: str):
+    """Unicode code points of s as an int32 array."""
+    return np.frombuffer(s.encode('utf-32-le'), np.int32)
+
+
+def _diagonal_fill(ref_arr, hyp_arr):
+    """Vectorised Levenshtein DP fill, one anti-diagonal at a time.
+
+    Every cell on anti-diagonal d = i + j depends only on diagonals d-1 and d-2,
+    so a whole diagonal is computed with a single np.minimum over int32 arrays.
+    """
+    n, m = ref_arr.shape[0], hyp_arr.shape[0]
+    dp = np.zeros((n + 1, m + 1), np.int32)
+    dp[:, 0] = np.arange(n + 1)
+    dp[0, :] = np.arange(m + 1)
+
+    for d in range(2, n + m + 1):
+        i = np.arange(max(1, d - m), min(n, d - 1) + 1)
+        j = d - i
+        cost = ref_arr[i - 1] != hyp_arr[j - 1]
+        dp[i, j] = np.minimum(
+            np.minimum(dp[i - 1, j], dp[i, j - 1]) + 1,  # deletion / insertion
+            dp[i - 1, j - 1] + cost                      # substitution
+        )
+
+    return dp
+
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _lev_fill(ref_arr, hyp_arr, dp):
+        """Native-code fill of a preallocated Levenshtein DP table."""
+        n, m = ref_arr.shape[0], hyp_arr.shape[0]
+        for i in range(n + 1):
+            dp[i, 0] = i
+        for j in range(m + 1):
+            dp[0, j] = j
+        for i in range(1, n + 1):
+            for j in range(1, m + 1):
+                cost = 0 if ref_arr[i - 1] == hyp_arr[j - 1] else 1
+                dp[i, j] = min(dp[i - 1, j] + 1, dp[i, j - 1] + 1, dp[i - 1, j - 1] + cost)
+
+
+def _editops_align(ref: str, hyp: str) -> List[EditOp]:
+    """Expand rapidfuzz editops into a full alignment, filling in the equal runs."""
+    ops = []
+    i = j = 0
+
+    for tag, src, dest in Levenshtein.editops(ref, hyp).as_list():
+        while i < src:
+            ops.append(EditOp(ref[i], hyp[j], '='))
+            i += 1
+            j += 1
+
+        op = _EDITOP_TAGS[tag]
+        ref_char = ref[i] if op != 'I' else ''
+        hyp_char = hyp[j] if op != 'D' else ''
+        ops.append(EditOp(ref_char, hyp_char, op))
+        if op != 'I':
+            i += 1
+        if op != 'D':
+            j += 1
+
+    while i < len(ref):
+        ops.append(EditOp(ref[i], hyp[j], '='))
+        i += 1
+        j += 1
+
+    return ops
+
+
+def word_align(ref_words: List[str], hyp_words: List[str]) -> List[WordEditOp]:
+    """Simplified word-level alignment using difflib on the token lists."""
+    # autojunk=False keeps frequent words from being treated as junk on long pages
+    matcher = SequenceMatcher(a=ref_words, b=hyp_words, autojunk=False)
     ops = []
     
     for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-        ref_slice = ref_str[i1:i2].split()
-        hyp_slice = hyp_str[j1:j2].split()
+        ref_slice = ref_words[i1:i2]
+        hyp_slice = hyp_words[j1:j2]
         
         if tag == 'equal':
             ops.append(WordEditOp(ref_slice, hyp_slice, '='))
@@ -120,9 +244,9 @@ def word_align(ref_words: List[str], hyp_words: List[str]) -> List[WordEditOp]:
     return ops
 
 
-def classify_char_errors(ops: List[EditOp]) -> tuple[Dict, Dict]:
+def classify_char_errors(ops: List[EditOp]) -> tuple[Counter, Counter]:
     """Classify character-level errors."""
-    stats = defaultdict(int)
+    stats = Counter()
     sub_pairs = Counter()
     
     for op in ops:
@@ -134,37 +258,76 @@ def classify_char_errors(ops: List[EditOp]) -> tuple[Dict, Dict]:
         elif op.operation == 'I':
             stats[ErrorType.CHAR_INS.value] += 1
     
-    return dict(stats), dict(sub_pairs)
+    return stats, sub_pairs
+
+
+def levenshtein_distance(s1: str, s2: str, score_cutoff: Optional[int] = None) -> int:
+    """Simple Levenshtein distance implementation.
+
+    With score_cutoff, any distance above the cutoff is reported as score_cutoff + 1.
+    """
+    if Levenshtein is not None:
+        return Levenshtein.distance(s1, s2, score_cutoff=score_cutoff)
 
+    if score_cutoff is not None:
+        return _banded_distance(s1, s2, score_cutoff)
 
-def levenshtein_distance(s1: str, s2: str) -> int:
-    """Simple Levenshtein distance implementation."""
     if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
+        s1, s2 = s2, s1
     
     if len(s2) == 0:
         return len(s1)
     
-    previous_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        current_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = previous_row[j + 1] + 1
-            deletions = current_row[j] + 1
-            substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
+    # Two preallocated rows, swapped after each pass instead of rebuilt
+    previous_row = list(range(len(s2) + 1))
+    current_row = [0] * (len(s2) + 1)
+    for i, c1 in enumerate(s1, 1):
+        current_row[0] = i
+        for j, c2 in enumerate(s2, 1):
+            insertions = previous_row[j] + 1
+            deletions = current_row[j - 1] + 1
+            substitutions = previous_row[j - 1] + (c1 != c2)
+            current_row[j] = min(insertions, deletions, substitutions)
+        previous_row, current_row = current_row, previous_row
     
     return previous_row[-1]
 
 
+def _banded_distance(s1: str, s2: str, k: int) -> int:
+    """Levenshtein distance restricted to the diagonal band of width 2*k+1."""
+    n, m = len(s1), len(s2)
+    if abs(n - m) > k:
+        return k + 1
+
+    out = k + 1
+    prev = [min(j, out) for j in range(m + 1)]
+    curr = [out] * (m + 1)
+
+    for i in range(1, n + 1):
+        lo = max(1, i - k)
+        hi = min(m, i + k)
+        curr[lo - 1] = min(i, out) if lo == 1 else out
+        c1 = s1[i - 1]
+        best = curr[lo - 1]
+        for j in range(lo, hi + 1):
+            cell = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + (c1 != s2[j - 1]), out)
+            curr[j] = cell
+            if cell < best:
+                best = cell
+        if best >= out:
+            return out
+        prev, curr = curr, prev
+
+    return prev[m]
+
+
 def is_merge(ref_words: List[str], hyp_words: List[str], max_dist: int = 2) -> bool:
     """Check if hypothesis word is merge of multiple reference words."""
     if len(ref_words) < 2 or len(hyp_words) != 1:
         return False
     
     merged_ref = ''.join(ref_words)
-    return levenshtein_distance(merged_ref, hyp_words[0]) <= max_dist
+    return levenshtein_distance(merged_ref, hyp_words[0], score_cutoff=max_dist) <= max_dist
 
 
 def is_split(ref_words: List[str], hyp_words: List[str], max_dist: int = 2) -> bool:
@@ -173,7 +336,7 @@ def is_split(ref_words: List[str], hyp_words: List[str], max_dist: int = 2) -> b
         return False
     
     merged_hyp = ''.join(hyp_words)
-    return levenshtein_distance(ref_words[0], merged_hyp) <= max_dist
+    return levenshtein_distance(ref_words[0], merged_hyp, score_cutoff=max_dist) <= max_dist
 
 
 def is_abbrev_expansion(ref_word: str, hyp_word: str, min_ratio: float = 1.5) -> bool:
@@ -191,9 +354,9 @@ def is_abbrev_expansion(ref_word: str, hyp_word: str, min_ratio: float = 1.5) ->
     return False
 
 
-def classify_word_errors(word_ops: List[WordEditOp]) -> tuple[Dict, Dict]:
+def classify_word_errors(word_ops: List[WordEditOp]) -> tuple[Counter, Dict]:
     """Classify word-level errors."""
-    stats = defaultdict(int)
+    stats = Counter()
     examples = defaultdict(list)
     
     for op in word_ops:
@@ -221,73 +384,109 @@ def classify_word_errors(word_ops: List[WordEditOp]) -> tuple[Dict, Dict]:
         elif op.operation in ('D', 'I'):
             stats[f"word_{op.operation.lower()}"] += 1
     
-    return dict(stats), dict(examples)
+    return stats, dict(examples)
+
+
+_PAGE_SEP = re.compile(r'\n\s*\n|\n\d+\.\s*\n')
 
 
-def parse_pages(text: str) -> List[str]:
-    """Simple page splitting by double newlines or numbered sections."""
+def parse_pages(text: str) -> Iterator[str]:
+    """Simple page splitting by double newlines or numbered sections.
+
+    Pages are yielded one at a time as the separators are found.
+    """
     # Split by double newlines or page-like patterns
-    pages = re.split(r'\n\s*\n|\n\d+\.\s*\n', text.strip())
-    return [p.strip() for p in pages if p.strip()]
+    text = text.strip()
+    last = 0
+    for sep in _PAGE_SEP.finditer(text):
+        page = text[last:sep.start()].strip()
+        if page:
+            yield page
+        last = sep.end()
+    page = text[last:].strip()
+    if page:
+        yield page
+
+
+def read_text(path: str) -> str:
+    """Read a UTF-8 text file in one binary read, normalizing newlines to '\\n'."""
+    text = Path(path).read_bytes().decode('utf-8')
+    # Same newline handling as text mode, but only when the file needs it
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+# Pages submitted per worker process in each batch of analyze_pages
+_PAGES_PER_WORKER = 16
+
+
+def _process_page(page: Tuple[int, Tuple[str, str]]) -> Tuple[Counter, Counter, Counter, List]:
+    """Analyse a single (page_idx, (ref_page, hyp_page)) pair."""
+    page_idx, (ref_page, hyp_page) = page
+    
+    # Character alignment
+    char_ops = levenshtein_align(ref_page, hyp_page)
+    char_stats, sub_pairs = classify_char_errors(char_ops)
+    
+    # Word alignment
+    ref_words = ref_page.split()
+    hyp_words = hyp_page.split()
+    word_ops = word_align(ref_words, hyp_words)
+    word_stats, word_examples = classify_word_errors(word_ops)
+    
+    # Log errors with page context
+    page_errors = []
+    for op in word_ops:
+        if op.operation != '=':
+            error_row = {
+                'page': page_idx + 1,
+                'ref_context': ' '.join(op.ref_words),
+                'hyp_context': ' '.join(op.hyp_words),
+                'error_type': op.operation
+            }
+            page_errors.append(error_row)
+    
+    return char_stats, sub_pairs, word_stats, page_errors
+
 
+def analyze_pages(ref_file: str, hyp_file: str, workers: Optional[int] = None) -> Tuple[Dict, List, Dict]:
+    """Main analysis function working page by page.
 
-def analyze_pages(ref_file: str, hyp_file: str) -> Tuple[Dict, List, Dict]:
-    """Main analysis function working page by page."""
+    Pages are processed in parallel by up to `workers` processes (default: CPU count).
+    """
     try:
-        with open(ref_file, 'r', encoding='utf-8') as f:
-            ref_text = f.read()
-        with open(hyp_file, 'r', encoding='utf-8') as f:
-            hyp_text = f.read()
+        ref_text = read_text(ref_file)
+        hyp_text = read_text(hyp_file)
     except FileNotFoundError as e:
         print(f"Greška: Datoteka nije pronađena - {e}")
         print("Provjerite postoje li datoteke 'reference' i 'hypothesis' direktoriju.")
         return {}, [], {}
     
-    ref_pages = parse_pages(ref_text)
-    hyp_pages = parse_pages(hyp_text)
-    
-    all_stats = defaultdict(int)
+    all_stats = Counter()
     all_errors = []
     all_sub_pairs = Counter()
-    
-    min_pages = min(len(ref_pages), len(hyp_pages))
-    
-    print(f"Analiziram {min_pages} stranica...")
-    
-    for page_idx in range(min_pages):
-        ref_page = ref_pages[page_idx]
-        hyp_page = hyp_pages[page_idx]
-        
-        # Character alignment
-        char_ops = levenshtein_align(ref_page, hyp_page)
-        char_stats, sub_pairs = classify_char_errors(char_ops)
-        
-        for k, v in char_stats.items():
-            all_stats[k] += v
-        all_sub_pairs.update(sub_pairs)
-        
-        # Word alignment
-        ref_words = ref_page.split()
-        hyp_words = hyp_page.split()
-        word_ops = word_align(ref_words, hyp_words)
-        word_stats, word_examples = classify_word_errors(word_ops)
-        
-        for k, v in word_stats.items():
-            all_stats[k] += v
-        
-        # Log errors with page context
-        page_errors = []
-        for op in word_ops:
-            if op.operation != '=':
-                error_row = {
-                    'page': page_idx + 1,
-                    'ref_context': ' '.join(op.ref_words),
-                    'hyp_context': ' '.join(op.hyp_words),
-                    'error_type': op.operation
-                }
-                page_errors.append(error_row)
-        
-        all_errors.extend(page_errors)
+    num_pages = 0
+    
+    print("Analiziram stranice...")
+    
+    # Pages are independent, so they are analysed in worker processes and
+    # merged here in page order. Executor.map submits its whole input at once,
+    # so pages are handed over in bounded batches to keep only a batch in flight.
+    pages = enumerate(zip(parse_pages(ref_text), parse_pages(hyp_text)))
+    batch_size = _PAGES_PER_WORKER * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while batch := list(islice(pages, batch_size)):
+            results = executor.map(_process_page, batch, chunksize=4)
+            for char_stats, sub_pairs, word_stats, page_errors in results:
+                num_pages += 1
+                all_stats.update(char_stats)
+                all_sub_pairs.update(sub_pairs)
+                all_stats.update(word_stats)
+                
+                all_errors.extend(page_errors)
+    
+    print(f"Analizirano {num_pages} stranica.")
     
     return dict(all_stats), all_errors, dict(all_sub_pairs)
 
@@ -333,11 +532,13 @@ def main():
     parser.add_argument('reference', help="Gold-standard transcription (.txt)")
     parser.add_argument('hypothesis', help="HTR/Transkribus transcription (.txt)") 
     parser.add_argument('output_prefix', help="Output file prefix")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
     
     args = parser.parse_args()
     
     print("Analyzing transcriptions...")
-    stats, errors, sub_pairs = analyze_pages(args.reference, args.hypothesis)
+    stats, errors, sub_pairs = analyze_pages(args.reference, args.hypothesis, args.workers)
     
     save_outputs(stats, errors, sub_pairs, args.output_prefix)
     
@@ -5,11 +5,15 @@ import matplotlib.pyplot as plt
 df = pd.read_csv('rezultati.csv', sep=';', decimal=',')
 df['CER'] = pd.to_numeric(df['CER'], errors='coerce')
 df['Linija'] = pd.to_numeric(df['Linija'], errors='coerce')
+# Izbaci neispravne retke jednom, za oba grafa i statistiku
+df = df.dropna(subset=['CER', 'Linija'])
+cer = df['CER'].to_numpy()
 
 # Graf CER po linijama
 plt.figure(figsize=(15, 6))
-plt.subplot(1, 2, 1)
-plt.plot(df['Linija'], df['CER'], marker='o', linewidth=2, markersize=3)
+ax = plt.subplot(1, 2, 1)
+# Bez markera po točki; linija se rasterizira kao jedan objekt
+ax.plot(df['Linija'].to_numpy(), cer, linewidth=1, rasterized=True)
 plt.title('CER per Line')
 plt.xlabel('Line')
 plt.ylabel('CER (%)')
@@ -17,7 +21,7 @@ plt.grid(True, alpha=0.3)
 
 # Prosječni CER i boxplot
 plt.subplot(1, 2, 2)
-plt.boxplot(df['CER'].dropna())
+plt.boxplot(cer)
 plt.title(f' CER Distribution\nAvg: {df["CER"].mean():.2f}%')
 plt.ylabel('CER (%)')
 
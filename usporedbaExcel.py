@@ -1,52 +1,45 @@
-def usporedi_datoteke(putanja1, putanja2, praznine):
-    try:
-        with open(putanja1, 'r', encoding='utf-8') as f1:
-            linije1 = f1.readlines()
-        with open(putanja2, 'r', encoding='utf-8') as f2:
-            linije2 = f2.readlines()
+import operator
+from itertools import zip_longest
 
-        # Pronađi koja datoteka ima više linija
-        broj_linija1 = len(linije1)
-        broj_linija2 = len(linije2)
-        max_broj_linija = max(broj_linija1, broj_linija2)
 
+def usporedi_datoteke(putanja1, putanja2, praznine):
+    try:
         ukupno_podudaranja = 0
         ukupno_znakova = 0
 
-        print("Linija;Podudaranje;CER")
+        # Linije čitamo u paru bez učitavanja cijelih datoteka; ako jedna datoteka
+        # ima manje linija, nedostajuće linije su prazan string
+        with open(putanja1, 'r', encoding='utf-8', buffering=1 << 20) as f1, \
+                open(putanja2, 'r', encoding='utf-8', buffering=1 << 20) as f2:
+            print("Linija;Podudaranje;CER")
 
-        for i in range(max_broj_linija):
-            # Dohvaćamo liniju ili prazan string ako linija ne postoji u jednoj od datoteka
-            l1 = linije1[i].rstrip('\n') if i < broj_linija1 else ""
-            l2 = linije2[i].rstrip('\n') if i < broj_linija2 else ""
+            for i, (l1, l2) in enumerate(zip_longest(f1, f2, fillvalue='')):
+                l1 = l1.rstrip('\n')
+                l2 = l2.rstrip('\n')
 
-            if praznine:
-                l1 = l1.replace(' ', '')
-                l2 = l2.replace(' ', '')
+                if praznine:
+                    l1 = l1.replace(' ', '')
+                    l2 = l2.replace(' ', '')
 
 
-            # Određujemo koliko znakova uspoređujemo (dužina duže linije)
-            max_len_linije = max(len(l1), len(l2))
-            lokalna_podudaranja = 0
+                # Određujemo koliko znakova uspoređujemo (dužina duže linije)
+                max_len_linije = max(len(l1), len(l2))
 
 
-            # 3. Usporedba znak po znak do dužine kraće linije
-            min_len_linije = min(len(l1), len(l2))
-            for j in range(min_len_linije):
-                if l1[j] == l2[j]:
-                    lokalna_podudaranja += 1
+                # 3. Usporedba znak po znak do dužine kraće linije (map staje na kraćoj liniji)
+                lokalna_podudaranja = sum(map(operator.eq, l1, l2))
 
-            # Izračun postotka za liniju
-            if max_len_linije > 0:
-                postotak_linije = (lokalna_podudaranja / max_len_linije) * 100
-            else:
-                postotak_linije = 100.0 if l1 == l2 else 0.0
+                # Izračun postotka za liniju
+                if max_len_linije > 0:
+                    postotak_linije = (lokalna_podudaranja / max_len_linije) * 100
+                else:
+                    postotak_linije = 100.0 if l1 == l2 else 0.0
 
-            print(f"{i+1};{postotak_linije:.2f};{100-postotak_linije:.2f}")
+                print(f"{i+1};{postotak_linije:.2f};{100-postotak_linije:.2f}")
 
-            # Dodavanje u ukupnu statistiku
-            ukupno_podudaranja += lokalna_podudaranja
-            ukupno_znakova += max_len_linije
+                # Dodavanje u ukupnu statistiku
+                ukupno_podudaranja += lokalna_podudaranja
+                ukupno_znakova += max_len_linije
 
         # 4. Ukupni postotak za cijele datoteke
         if ukupno_znakova > 0: